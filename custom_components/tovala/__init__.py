@@ -1,17 +1,29 @@
 # custom_components/tovala/__init__.py
 from __future__ import annotations
 import logging
-from homeassistant.core import HomeAssistant
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.exceptions import ConfigEntryNotReady, HomeAssistantError
+import homeassistant.helpers.config_validation as cv
 
-from .const import DOMAIN, PLATFORMS
+from .const import DOMAIN, PLATFORMS, CONF_OVEN_ID, SERVICE_EXPORT_HISTORY
 from .api import TovalaClient, TovalaAuthError, TovalaApiError
 from .coordinator import TovalaCoordinator
+from .export import FORMATS, FORMAT_JSONL, async_export_history
 
 _LOGGER = logging.getLogger(__name__)
 
+EXPORT_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_OVEN_ID): cv.string,
+        vol.Optional("format", default=FORMAT_JSONL): vol.In(FORMATS),
+        vol.Optional("filename"): cv.string,
+        vol.Optional("resume", default=True): cv.boolean,
+    }
+)
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Tovala from a config entry."""
@@ -52,18 +64,58 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             _LOGGER.error("Failed to discover ovens during setup: %s", e, exc_info=True)
             oven_id = None
 
-    coord = TovalaCoordinator(hass, client, oven_id)
+    coord = TovalaCoordinator(hass, client, oven_id, entry)
     await coord.async_config_entry_first_refresh()
 
     hass.data[DOMAIN][entry.entry_id] = {"client": client, "coordinator": coord}
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    if not hass.services.has_service(DOMAIN, SERVICE_EXPORT_HISTORY):
+        _register_services(hass)
     return True
 
+
+def _register_services(hass: HomeAssistant) -> None:
+    """Register integration-wide services."""
+
+    async def export_history(call: ServiceCall) -> ServiceResponse:
+        oven_id = call.data.get(CONF_OVEN_ID)
+        loaded = list(hass.data.get(DOMAIN, {}).values())
+        matches = [d for d in loaded if not oven_id or d["coordinator"].oven_id == oven_id]
+        if not matches or not matches[0]["coordinator"].oven_id:
+            raise HomeAssistantError(f"No loaded Tovala oven matches {oven_id or 'request'}")
+
+        coord: TovalaCoordinator = matches[0]["coordinator"]
+        try:
+            return await async_export_history(
+                hass,
+                matches[0]["client"],
+                coord.oven_id,
+                fmt=call.data["format"],
+                filename=call.data.get("filename"),
+                resume=call.data["resume"],
+                meal=(coord.data or {}).get("meal"),
+            )
+        except (TovalaApiError, OSError) as err:
+            raise HomeAssistantError(f"History export failed: {err}") from err
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_HISTORY,
+        export_history,
+        schema=EXPORT_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
  
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a Tovala config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id, None)
+        data = hass.data[DOMAIN].pop(entry.entry_id, None)
+        if data:
+            await data["coordinator"].async_shutdown()
+        if not hass.data[DOMAIN]:
+            hass.services.async_remove(DOMAIN, SERVICE_EXPORT_HISTORY)
     return unload_ok
\ No newline at end of file
@@ -1,11 +1,23 @@
 # custom_components/tovala/api.py
 from __future__ import annotations
-from typing import Any, Dict, List, Optional, Sequence
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
 from aiohttp import ClientSession, ClientError, ClientTimeout
 import time
 import logging
 import json
 import base64
+import codecs
+from contextlib import aclosing
+
+from .scheduler import (
+    LANE_AUTH,
+    LANE_EXPORT,
+    LANE_HISTORY,
+    LANE_MEALS,
+    LANE_STATUS,
+    RequestDropped,
+    RequestScheduler,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -16,6 +28,15 @@ DEFAULT_BASES: Sequence[str] = (
 )
 
 LOGIN_PATH = "/v0/getToken"
+HISTORY_PATH = "/v0/users/{user_id}/ovens/{oven_id}/cook/history"
+
+# Stop reading a history response after this many bytes
+HISTORY_MAX_BYTES = 1024 * 1024
+STREAM_CHUNK_SIZE = 16 * 1024
+# Largest single array element a stream will buffer before giving up
+STREAM_MAX_ELEMENT_CHARS = 256 * 1024
+# Characters that may follow a complete array element
+_ELEMENT_DELIMITERS = " \t\r\n,]"
 
 class TovalaAuthError(Exception):
     """Authentication failed (bad credentials or denied)."""
@@ -23,6 +44,14 @@ class TovalaAuthError(Exception):
 class TovalaApiError(Exception):
     """Other API/HTTP failures."""
 
+    def __init__(self, message: str = "", status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status  # HTTP status, when the server answered
+
+def _is_param_rejection(status: Optional[int]) -> bool:
+    """Whether an HTTP status means the server refused the request's parameters."""
+    return status is not None and 400 <= status < 500 and status not in (401, 403, 404, 429)
+
 class TovalaClient:
     def __init__(
         self,
@@ -40,6 +69,8 @@ class TovalaClient:
         self._bases: Sequence[str] = api_bases or DEFAULT_BASES
         self._base: Optional[str] = None  # set on successful login
         self._user_id: Optional[int] = None  # extracted from JWT token
+        self._history_limit_supported: Optional[bool] = None  # probed on first history fetch
+        self._scheduler = RequestScheduler()
 
     @property
     def base_url(self) -> Optional[str]:
@@ -49,6 +80,10 @@ class TovalaClient:
     def user_id(self) -> Optional[int]:
         return self._user_id
 
+    def request_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Per-lane queue depth and wait times for this account's requests."""
+        return self._scheduler.metrics()
+
     def _decode_jwt_user_id(self, token: str) -> Optional[int]:
         """Extract userId from JWT token payload without verification."""
         try:
@@ -81,6 +116,14 @@ class TovalaClient:
 
     async def login(self) -> None:
         """Ensure we have a valid bearer token. Tries beta then prod."""
+        if self._token and self._token_exp > time.time() + 60:
+            return
+        # Auth has the highest priority lane; concurrent callers queue here
+        # and find the token already refreshed once they get the slot.
+        async with self._scheduler.slot(LANE_AUTH):
+            await self._login()
+
+    async def _login(self) -> None:
         if self._token and self._token_exp > time.time() + 60:
             _LOGGER.debug("Token still valid, skipping login")
             return
@@ -191,7 +234,7 @@ class TovalaClient:
             "X-Tovala-AppID": "MAPP",
         }
 
-    async def _get_json(self, path: str, **fmt) -> Any:
+    async def _get_json(self, path: str, lane: str = LANE_STATUS, **fmt) -> Any:
         if not self._base:
             # Ensure login determined the base URL
             await self.login()
@@ -202,19 +245,119 @@ class TovalaClient:
         
         try:
             timeout = ClientTimeout(total=10)
-            async with self._session.get(url, headers=headers, timeout=timeout) as r:
+            async with self._scheduler.slot(lane), self._session.get(
+                url, headers=headers, timeout=timeout
+            ) as r:
                 txt = await r.text()
                 _LOGGER.debug("GET %s -> %s, body=%s", url, r.status, txt[:200])
                 
                 if r.status == 404:
-                    raise TovalaApiError("not_found")
+                    raise TovalaApiError("not_found", status=r.status)
                 if r.status >= 400:
-                    raise TovalaApiError(f"HTTP {r.status}: {txt}")
+                    raise TovalaApiError(f"HTTP {r.status}: {txt}", status=r.status)
                 try:
-                    return await r.json()
-                except Exception:
+                    return json.loads(txt)
+                except ValueError:
                     # Some endpoints may return empty body
                     return {}
+        except RequestDropped as e:
+            raise TovalaApiError(f"Request dropped: {e}") from e
+        except ClientError as e:
+            _LOGGER.error("Connection error for %s: %s", url, str(e))
+            raise TovalaApiError(f"Connection failed: {str(e)}")
+
+    async def _iter_json_array(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        max_bytes: Optional[int] = None,
+        timeout: Optional[ClientTimeout] = None,
+        lane: str = LANE_HISTORY,
+    ) -> AsyncIterator[Any]:
+        """Stream a JSON array response, yielding one element at a time.
+
+        Only the element currently being decoded is held in memory. Stops
+        the response once max_bytes have been read; the caller can stop
+        early by breaking out of the iteration. Raises TovalaApiError if the
+        body is not a JSON array or ends before the array is closed.
+        """
+        if not self._base:
+            await self.login()
+        assert self._base, "Base URL not set after login"
+        headers = await self._auth_headers()
+        url = f"{self._base}{path}"
+        _LOGGER.debug("GET (stream) %s params=%s", url, params)
+
+        decoder = json.JSONDecoder()
+        utf8 = codecs.getincrementaldecoder("utf-8")()
+        buf = ""
+        pos = 0
+        started = False
+        read = 0
+
+        try:
+            async with self._scheduler.slot(lane), self._session.get(
+                url,
+                headers=headers,
+                params=params,
+                timeout=timeout or ClientTimeout(total=10),
+            ) as r:
+                if r.status >= 400:
+                    txt = await r.text()
+                    _LOGGER.debug("GET %s -> %s, body=%s", url, r.status, txt[:200])
+                    if r.status == 404:
+                        raise TovalaApiError("not_found", status=r.status)
+                    raise TovalaApiError(f"HTTP {r.status}: {txt}", status=r.status)
+
+                async for chunk in r.content.iter_chunked(STREAM_CHUNK_SIZE):
+                    read += len(chunk)
+                    buf = buf[pos:] + utf8.decode(chunk)
+                    pos = 0
+
+                    while True:
+                        while pos < len(buf) and buf[pos] in " \t\r\n,":
+                            pos += 1
+                        if pos >= len(buf):
+                            break
+                        if not started:
+                            if buf[pos] != "[":
+                                raise TovalaApiError(
+                                    f"Expected JSON array from {url}, got {buf[pos]!r}"
+                                )
+                            started = True
+                            pos += 1
+                            continue
+                        if buf[pos] == "]":
+                            return
+                        try:
+                            item, end = decoder.raw_decode(buf, pos)
+                        except ValueError:
+                            # Element is split across chunks; wait for more data
+                            break
+                        if not isinstance(item, (dict, list)) and (
+                            end >= len(buf) or buf[end] not in _ELEMENT_DELIMITERS
+                        ):
+                            # A bare scalar is only complete once a delimiter
+                            # follows it ("4." may still become "4.5e3")
+                            break
+                        pos = end
+                        yield item
+
+                    if len(buf) - pos > STREAM_MAX_ELEMENT_CHARS:
+                        raise TovalaApiError(
+                            f"Malformed or oversized element in JSON array from {url}"
+                        )
+
+                    if max_bytes is not None and read >= max_bytes:
+                        _LOGGER.warning(
+                            "Stopped reading %s after %d bytes (cap %d)", url, read, max_bytes
+                        )
+                        return
+
+                if started or buf[pos:].strip():
+                    raise TovalaApiError(f"Truncated JSON array from {url}")
+        except RequestDropped as e:
+            raise TovalaApiError(f"Request dropped: {e}") from e
         except ClientError as e:
             _LOGGER.error("Connection error for %s: %s", url, str(e))
             raise TovalaApiError(f"Connection failed: {str(e)}")
@@ -228,7 +371,7 @@ class TovalaClient:
 
         try:
             path = f"/v0/users/{self._user_id}/ovens"
-            data = await self._get_json(path)
+            data = await self._get_json(path, lane=LANE_AUTH)
             _LOGGER.debug("Ovens endpoint returned: %s", data)
 
             if isinstance(data, list):
@@ -272,21 +415,37 @@ class TovalaClient:
         if not self._user_id:
             raise TovalaApiError("No user_id available - login first")
 
-        _LOGGER.debug("Fetching meal details for meal %s (user %s)", meal_id, self._user_id)
-
         try:
-            path = f"/v1/users/{self._user_id}/meals/{meal_id}"
-            data = await self._get_json(path)
-            _LOGGER.debug("Meal details endpoint returned: %s", data)
-
-            # Response format: {"meal": {...}}
-            if isinstance(data, dict) and "meal" in data:
-                return data["meal"]
-            return data
+            return await self.fetch_meal_details(meal_id)
         except Exception as e:
             _LOGGER.warning("Failed to fetch meal details for meal_id %s: %s", meal_id, e)
             return None
 
+    async def fetch_meal_details(self, meal_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch meal details by ID, returning None only if the meal doesn't exist.
+
+        Unlike meal_details, transient failures raise TovalaApiError so
+        callers can tell them apart from a confirmed miss.
+        """
+        if not self._user_id:
+            raise TovalaApiError("No user_id available - login first")
+
+        _LOGGER.debug("Fetching meal details for meal %s (user %s)", meal_id, self._user_id)
+
+        path = f"/v1/users/{self._user_id}/meals/{meal_id}"
+        try:
+            data = await self._get_json(path, lane=LANE_MEALS)
+        except TovalaApiError as e:
+            if e.status == 404:
+                return None
+            raise
+        _LOGGER.debug("Meal details endpoint returned: %s", data)
+
+        # Response format: {"meal": {...}}
+        if isinstance(data, dict) and "meal" in data:
+            return data["meal"]
+        return data
+
     async def cooking_history(self, oven_id: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Fetch cooking history for an oven."""
         if not oven_id:
@@ -298,15 +457,60 @@ class TovalaClient:
 
         _LOGGER.debug("Fetching cooking history for oven %s (user %s)", oven_id, self._user_id)
 
+        path = HISTORY_PATH.format(user_id=self._user_id, oven_id=oven_id)
         try:
-            path = f"/v0/users/{self._user_id}/ovens/{oven_id}/cook/history"
-            data = await self._get_json(path)
-            _LOGGER.debug("Cooking history endpoint returned: %s entries", len(data) if isinstance(data, list) else "unknown")
-
-            if isinstance(data, list):
-                # Return limited results (most recent first)
-                return data[:limit]
-            return []
+            params = {"limit": limit} if self._history_limit_supported is not False else None
+            try:
+                history = await self._read_history(path, limit, params)
+            except TovalaApiError as e:
+                if not params or not _is_param_rejection(e.status):
+                    raise
+                # Server rejected the limit parameter; don't send it again
+                _LOGGER.debug("History endpoint rejected limit parameter: %s", e)
+                self._history_limit_supported = False
+                history = await self._read_history(path, limit, None)
+            _LOGGER.debug("Cooking history endpoint returned: %s entries", len(history))
+            return history
         except Exception as e:
             _LOGGER.warning("Failed to fetch cooking history: %s", e)
-            return []
\ No newline at end of file
+            return []
+
+    async def iter_cooking_history(self, oven_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yield an oven's entire cooking history, most recent first.
+
+        Entries are streamed off the wire one at a time, so memory use does
+        not depend on how long the history is.
+        """
+        if not self._user_id:
+            raise TovalaApiError("No user_id available - login first")
+
+        path = HISTORY_PATH.format(user_id=self._user_id, oven_id=oven_id)
+        # No total timeout: a full history can take a while, but a stalled read still fails
+        timeout = ClientTimeout(total=None, sock_connect=10, sock_read=30)
+        async with aclosing(
+            self._iter_json_array(path, timeout=timeout, lane=LANE_EXPORT)
+        ) as entries:
+            async for entry in entries:
+                if isinstance(entry, dict):
+                    yield entry
+
+    async def _read_history(
+        self, path: str, limit: int, params: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Read up to limit history entries (most recent first), then stop."""
+        history: List[Dict[str, Any]] = []
+        overflow = False
+        async with aclosing(
+            self._iter_json_array(path, params=params, max_bytes=HISTORY_MAX_BYTES)
+        ) as entries:
+            async for entry in entries:
+                if len(history) >= limit:
+                    overflow = True
+                    break
+                history.append(entry)
+
+        if params and self._history_limit_supported is None:
+            # An entry past the limit means the server ignores the parameter
+            self._history_limit_supported = not overflow
+            _LOGGER.debug("History limit parameter supported: %s", self._history_limit_supported)
+        return history
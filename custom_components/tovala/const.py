@@ -5,5 +5,8 @@ CONF_PASSWORD = "password"
 CONF_OVEN_ID = "oven_id"
 
 EVENT_TIMER_FINISHED = "tovala_timer_finished"
+EVENT_EXPORT_PROGRESS = "tovala_export_progress"
+
+SERVICE_EXPORT_HISTORY = "export_history"
 
 DEFAULT_SCAN_INTERVAL = 10  # seconds
\ No newline at end of file
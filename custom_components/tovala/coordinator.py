@@ -1,19 +1,22 @@
 from __future__ import annotations
 from datetime import timedelta, datetime
 from typing import Any, Optional
+import asyncio
 import logging
 import re
 
+from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 from homeassistant.util import dt as dt_util
 
+from .api import TovalaApiError
 from .const import DOMAIN, DEFAULT_SCAN_INTERVAL, EVENT_TIMER_FINISHED
 
 _LOGGER = logging.getLogger(__name__)
 
 class TovalaCoordinator(DataUpdateCoordinator[dict[str, Any]]):
-    def __init__(self, hass: HomeAssistant, client, oven_id: str):
+    def __init__(self, hass: HomeAssistant, client, oven_id: str, entry: ConfigEntry):
         super().__init__(
             hass,
             _LOGGER,  # Changed from hass.helpers.logger.getLogger(__name__)
@@ -22,9 +25,12 @@ class TovalaCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         )
         self.client = client
         self.oven_id = oven_id
+        self._entry = entry
         self._last_reported_remaining = None
         self._last_meal_id = None
         self._cached_meal_details = None
+        self._meal_task: Optional[asyncio.Task] = None
+        self._meal_task_id: Optional[str] = None
 
     def _extract_meal_id(self, barcode: str) -> Optional[str]:
         """Extract meal_id from barcode.
@@ -45,6 +51,62 @@ class TovalaCoordinator(DataUpdateCoordinator[dict[str, Any]]):
 
         return None
 
+    def _start_meal_fetch(self, meal_id: str) -> None:
+        """Resolve meal details in a tracked background task.
+
+        A fetch already in flight for a different meal is cancelled, so only
+        the most recently scanned barcode can populate the meal cache.
+        """
+        self._cancel_meal_fetch()
+        self._meal_task_id = meal_id
+        # Tied to the config entry so unloading it cancels the task too
+        self._meal_task = self._entry.async_create_background_task(
+            self.hass,
+            self._async_fetch_meal(meal_id),
+            name=f"{DOMAIN}_meal_{meal_id}",
+        )
+
+    def _cancel_meal_fetch(self) -> None:
+        """Cancel any in-flight meal details fetch."""
+        if self._meal_task and not self._meal_task.done():
+            _LOGGER.debug("Cancelling meal details fetch for meal %s", self._meal_task_id)
+            self._meal_task.cancel()
+        self._meal_task = None
+        self._meal_task_id = None
+
+    async def _async_fetch_meal(self, meal_id: str) -> None:
+        """Fetch meal details and push them to listeners as a follow-up update."""
+        try:
+            meal_details = await self.client.meal_details(meal_id)
+        except TovalaApiError as e:
+            # No caller to surface this to; log it like a failed lookup
+            _LOGGER.warning("Failed to fetch meal details for meal_id %s: %s", meal_id, e)
+            return
+        finally:
+            if self._meal_task_id == meal_id:
+                self._meal_task = None
+                self._meal_task_id = None
+
+        if not meal_details:
+            # Leave _last_meal_id untouched so the next poll retries
+            _LOGGER.warning("Failed to fetch meal details for meal_id %s", meal_id)
+            return
+
+        self._cached_meal_details = meal_details
+        self._last_meal_id = meal_id
+        _LOGGER.info("Fetched meal details: %s", meal_details.get("title"))
+
+        if self.data is not None:
+            # Update in place rather than via async_set_updated_data so the
+            # status poll schedule is not reset
+            self.data["meal"] = meal_details
+            self.async_update_listeners()
+
+    async def async_shutdown(self) -> None:
+        """Cancel background work when the config entry is unloaded."""
+        self._cancel_meal_fetch()
+        await super().async_shutdown()
+
     async def _async_update_data(self) -> dict:
         if not self.oven_id:
             # Return empty data if we don't have an oven yet
@@ -97,21 +159,19 @@ class TovalaCoordinator(DataUpdateCoordinator[dict[str, Any]]):
             meal_id = self._extract_meal_id(barcode) if barcode else None
 
             if meal_id:
-                # New meal detected - fetch details
-                if meal_id != self._last_meal_id:
+                # New meal detected - resolve details in the background so the
+                # status update below is published without waiting on it
+                if meal_id != self._last_meal_id and meal_id != self._meal_task_id:
                     _LOGGER.info("New meal detected: %s (previous: %s)", meal_id, self._last_meal_id)
-                    meal_details = await self.client.meal_details(meal_id)
-                    if meal_details:
-                        self._cached_meal_details = meal_details
-                        self._last_meal_id = meal_id
-                        _LOGGER.info("Fetched meal details: %s", meal_details.get("title"))
-                    else:
-                        _LOGGER.warning("Failed to fetch meal details for meal_id %s", meal_id)
+                    # Drop the previous meal so it isn't shown against this cook
+                    self._cached_meal_details = None
+                    self._start_meal_fetch(meal_id)
             elif barcode and not meal_id:
                 # Manual cooking mode (no meal_id in barcode)
                 if barcode != self._last_meal_id:
                     _LOGGER.debug("Manual cooking mode: %s", barcode)
                     # Clear meal cache for manual modes
+                    self._cancel_meal_fetch()
                     self._last_meal_id = barcode
                     self._cached_meal_details = None
             # else: No barcode means cooking finished (state=idle), keep cached meal details
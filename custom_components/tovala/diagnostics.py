@@ -0,0 +1,26 @@
+# custom_components/tovala/diagnostics.py
+from __future__ import annotations
+from typing import Any, Dict
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, CONF_EMAIL, CONF_PASSWORD
+
+TO_REDACT = {CONF_EMAIL, CONF_PASSWORD, "token"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> Dict[str, Any]:
+    """Return diagnostics for a config entry, including API request metrics."""
+    data = hass.data[DOMAIN][entry.entry_id]
+    coord = data["coordinator"]
+    return {
+        "entry": async_redact_data(dict(entry.data), TO_REDACT),
+        "oven_id": coord.oven_id,
+        "last_update_success": coord.last_update_success,
+        "status": coord.data,
+        "request_metrics": data["client"].request_metrics(),
+    }
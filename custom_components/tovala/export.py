@@ -0,0 +1,323 @@
+# custom_components/tovala/export.py
+from __future__ import annotations
+from collections import OrderedDict
+from contextlib import aclosing
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, TextIO
+import asyncio
+import csv
+import json
+import logging
+import os
+import shutil
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .api import TovalaApiError, TovalaClient
+from .const import DOMAIN, EVENT_EXPORT_PROGRESS
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}_export"
+STORAGE_VERSION = 1
+
+FORMAT_CSV = "csv"
+FORMAT_JSONL = "jsonl"
+FORMATS = (FORMAT_CSV, FORMAT_JSONL)
+
+CSV_FIELDS = ("id", "start_time", "end_time", "status", "barcode", "meal_id", "meal_title")
+
+# Rows are handed to the executor in batches of this size
+WRITE_BATCH_SIZE = 100
+# Fire a progress event every this many exported entries
+PROGRESS_INTERVAL = 500
+# Upper bound on remembered meal titles
+MEAL_TITLE_CACHE_SIZE = 512
+
+# Serializes load/modify/save of the shared resume marker store
+_STORE_LOCK = asyncio.Lock()
+# Export files currently being written
+_ACTIVE_EXPORTS: Set[str] = set()
+
+
+def _history_key(entry: Dict[str, Any]) -> Optional[str]:
+    """Return a stable identifier for a history entry."""
+    key = entry.get("id") or entry.get("start_time")
+    return str(key) if key else None
+
+
+def _start_time(entry: Dict[str, Any]) -> Optional[datetime]:
+    value = entry.get("start_time")
+    if not isinstance(value, str):
+        return None
+    try:
+        return dt_util.parse_datetime(value)
+    except ValueError:
+        return None
+
+
+class MealTitleCache:
+    """Bounded meal_id -> title cache, filled from the meals endpoint on miss."""
+
+    def __init__(self, client: TovalaClient, size: int = MEAL_TITLE_CACHE_SIZE):
+        self._client = client
+        self._size = size
+        self._titles: OrderedDict[str, Optional[str]] = OrderedDict()
+
+    def seed(self, meal: Optional[Dict[str, Any]]) -> None:
+        if meal and meal.get("id") is not None:
+            self._store(str(meal["id"]), meal.get("title"))
+
+    def _store(self, meal_id: str, title: Optional[str]) -> None:
+        self._titles[meal_id] = title
+        self._titles.move_to_end(meal_id)
+        while len(self._titles) > self._size:
+            self._titles.popitem(last=False)
+
+    async def title(self, meal_id: Any) -> Optional[str]:
+        if meal_id is None or meal_id == "":
+            return None
+        key = str(meal_id)
+        if key in self._titles:
+            self._titles.move_to_end(key)
+            return self._titles[key]
+        try:
+            meal = await self._client.fetch_meal_details(key)
+        except TovalaApiError as e:
+            # Dropped, timed out or server error: leave it uncached so a
+            # later cook of the same meal tries again
+            _LOGGER.debug("Meal title lookup for %s failed: %s", key, e)
+            return None
+        # A meal that doesn't exist is cached too, so it costs one request
+        # per export rather than one per cook
+        title = meal.get("title") if meal else None
+        self._store(key, title)
+        return title
+
+
+async def _new_entries(
+    entries: AsyncIterator[Dict[str, Any]],
+    stop_key: Optional[str],
+    stop_start: Optional[datetime],
+) -> AsyncIterator[Dict[str, Any]]:
+    """Pass entries through until the last previously exported one is reached.
+
+    Besides an exact key match, history is newest first, so any entry that
+    started at or before the last exported one was already written. That
+    covers the marker's own entry having disappeared server-side.
+    """
+    async with aclosing(entries):
+        async for entry in entries:
+            if stop_key is not None and _history_key(entry) == stop_key:
+                return
+            started = _start_time(entry) if stop_start is not None else None
+            if started is not None:
+                try:
+                    if started <= stop_start:
+                        return
+                except TypeError:
+                    # Naive vs aware timestamp; fall back to the key match
+                    pass
+            yield entry
+
+
+async def _enrich(
+    entries: AsyncIterator[Dict[str, Any]], titles: MealTitleCache
+) -> AsyncIterator[Dict[str, Any]]:
+    """Attach meal_title to each entry."""
+    async with aclosing(entries):
+        async for entry in entries:
+            yield {**entry, "meal_title": await titles.title(entry.get("meal_id"))}
+
+
+async def _batched(
+    entries: AsyncIterator[Dict[str, Any]], size: int
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    batch: List[Dict[str, Any]] = []
+    async with aclosing(entries):
+        async for entry in entries:
+            batch.append(entry)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def _open(path: str, fmt: str, header: bool) -> TextIO:
+    """Open a fresh file for this run's rows, with a CSV header if asked."""
+    fh = open(path, "w", encoding="utf-8", newline="")
+    if fmt == FORMAT_CSV and header:
+        csv.writer(fh).writerow(CSV_FIELDS)
+    return fh
+
+
+def _discard(fh: TextIO, path: str) -> None:
+    fh.close()
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _commit(fh: TextIO, part_path: str, path: str, append: bool) -> None:
+    """Move a completed run into place, appending to the existing file on resume."""
+    fh.close()
+    if not append:
+        os.replace(part_path, path)
+        return
+    with open(part_path, "rb") as src, open(path, "ab") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(part_path)
+
+
+def _write_rows(fh: TextIO, fmt: str, rows: List[Dict[str, Any]]) -> None:
+    if fmt == FORMAT_CSV:
+        writer = csv.DictWriter(fh, fieldnames=CSV_FIELDS, extrasaction="ignore")
+        writer.writerows(rows)
+    else:
+        for row in rows:
+            fh.write(json.dumps(row, ensure_ascii=False))
+            fh.write("\n")
+    fh.flush()
+
+
+async def async_export_history(
+    hass: HomeAssistant,
+    client: TovalaClient,
+    oven_id: str,
+    fmt: str = FORMAT_JSONL,
+    filename: Optional[str] = None,
+    resume: bool = True,
+    meal: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Export an oven's full cooking history to a file in the config directory.
+
+    History is streamed from the API, enriched with meal titles and written
+    in batches, so memory use stays flat regardless of history length. With
+    resume, only entries newer than the last export to the same file are
+    appended.
+
+    Each run is written to a side file and only moved into place once the
+    history has been read to the end, so a failed run leaves the export
+    and its resume marker untouched. Existing files are only ever replaced
+    or appended to if an earlier export wrote them.
+    """
+    filename = os.path.basename(filename or f"tovala_history_{oven_id}.{fmt}")
+    if not filename.endswith(f".{fmt}"):
+        raise HomeAssistantError(f"Export filename must end in .{fmt}: {filename}")
+    if filename in _ACTIVE_EXPORTS:
+        raise HomeAssistantError(f"An export to {filename} is already running")
+
+    _ACTIVE_EXPORTS.add(filename)
+    try:
+        return await _async_export(hass, client, oven_id, fmt, filename, resume, meal)
+    finally:
+        _ACTIVE_EXPORTS.discard(filename)
+
+
+async def _async_export(
+    hass: HomeAssistant,
+    client: TovalaClient,
+    oven_id: str,
+    fmt: str,
+    filename: str,
+    resume: bool,
+    meal: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    path = hass.config.path(filename)
+    part_path = f"{path}.part"
+    store: Store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+
+    async with _STORE_LOCK:
+        marker = (await store.async_load() or {}).get(filename)
+
+    exists = await hass.async_add_executor_job(os.path.exists, path)
+    if exists and marker is None:
+        # Never clobber a file that no export of ours produced
+        raise HomeAssistantError(
+            f"{filename} already exists and was not written by a Tovala export"
+        )
+
+    columns = list(CSV_FIELDS) if fmt == FORMAT_CSV else None
+
+    # Only append to a file this oven's export of the same format and
+    # columns produced; anything else of ours is rewritten from scratch
+    append = (
+        resume
+        and exists
+        and marker.get("oven_id") == oven_id
+        and marker.get("format") == fmt
+        and marker.get("columns") == columns
+    )
+    if resume and exists and not append:
+        _LOGGER.info("Resume marker for %s doesn't match; rewriting it", path)
+    stop_key = marker.get("last_key") if append else None
+    stop_start = _start_time({"start_time": marker.get("last_start")}) if append else None
+
+    titles = MealTitleCache(client)
+    titles.seed(meal)
+
+    _LOGGER.info(
+        "Exporting cooking history for oven %s to %s (%s, resume from %s)",
+        oven_id, path, fmt, stop_key,
+    )
+
+    exported = 0
+    newest: Optional[Dict[str, Any]] = None
+    fh = await hass.async_add_executor_job(_open, part_path, fmt, not append)
+    try:
+        pipeline = _batched(
+            _enrich(
+                _new_entries(client.iter_cooking_history(oven_id), stop_key, stop_start),
+                titles,
+            ),
+            WRITE_BATCH_SIZE,
+        )
+        async with aclosing(pipeline) as batches:
+            async for batch in batches:
+                if newest is None:
+                    newest = batch[0]
+                await hass.async_add_executor_job(_write_rows, fh, fmt, batch)
+
+                previous = exported
+                exported += len(batch)
+                if exported // PROGRESS_INTERVAL > previous // PROGRESS_INTERVAL:
+                    _LOGGER.info("Exported %d history entries for oven %s", exported, oven_id)
+                    hass.bus.async_fire(EVENT_EXPORT_PROGRESS, {
+                        "oven_id": oven_id,
+                        "path": path,
+                        "exported": exported,
+                        "done": False,
+                    })
+    except BaseException:
+        await hass.async_add_executor_job(_discard, fh, part_path)
+        raise
+
+    await hass.async_add_executor_job(_commit, fh, part_path, path, append)
+
+    async with _STORE_LOCK:
+        state: Dict[str, Any] = await store.async_load() or {}
+        if newest is not None or not append:
+            # A marker is kept even for an empty export: it records that the
+            # file is ours to append to or replace
+            state[filename] = {
+                "oven_id": oven_id,
+                "format": fmt,
+                "columns": columns,
+                "last_key": _history_key(newest) if newest else None,
+                "last_start": newest.get("start_time") if newest else None,
+            }
+            await store.async_save(state)
+
+    _LOGGER.info("Exported %d history entries for oven %s to %s", exported, oven_id, path)
+    hass.bus.async_fire(EVENT_EXPORT_PROGRESS, {
+        "oven_id": oven_id,
+        "path": path,
+        "exported": exported,
+        "done": True,
+    })
+    return {"path": path, "exported": exported}
@@ -0,0 +1,169 @@
+# custom_components/tovala/scheduler.py
+from __future__ import annotations
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Mapping, Optional
+import asyncio
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+# Lanes in priority order: a free slot always goes to the highest lane waiting
+LANE_AUTH = "auth"
+LANE_STATUS = "status"
+LANE_MEALS = "meals"
+LANE_HISTORY = "history"
+LANE_EXPORT = "export"
+LANES = (LANE_AUTH, LANE_STATUS, LANE_MEALS, LANE_HISTORY, LANE_EXPORT)
+
+# Background lanes together stay below MAX_CONCURRENCY, so a status poll
+# never waits behind meal lookups or a history export.
+#
+# An export holds its slot for the whole run, including meal lookups and
+# disk writes, so it gets its own lane: the Last Cook sensor's short
+# history fetch never queues behind it. The cost is that only one export
+# per account runs at a time; a second one waits and may be dropped.
+MAX_CONCURRENCY = 5
+DEFAULT_LANE_LIMITS: Mapping[str, int] = {
+    LANE_AUTH: 1,
+    LANE_STATUS: 2,
+    LANE_MEALS: 2,
+    LANE_HISTORY: 1,
+    LANE_EXPORT: 1,
+}
+
+# Longest a request may sit in the queue before it is dropped as stale.
+# None means the request waits as long as it takes.
+DEFAULT_LANE_MAX_WAIT: Mapping[str, Optional[float]] = {
+    LANE_AUTH: None,
+    LANE_STATUS: None,
+    LANE_MEALS: 30.0,
+    LANE_HISTORY: 60.0,
+    LANE_EXPORT: 60.0,
+}
+
+
+class RequestDropped(Exception):
+    """A queued request passed its deadline before it could be sent."""
+
+
+class _LaneStats:
+    __slots__ = ("requests", "granted", "dropped", "max_depth", "wait_total", "wait_max")
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.granted = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+
+class RequestScheduler:
+    """Grant API request slots by lane priority with per-lane limits."""
+
+    def __init__(
+        self,
+        max_concurrency: int = MAX_CONCURRENCY,
+        lane_limits: Optional[Mapping[str, int]] = None,
+        lane_max_wait: Optional[Mapping[str, Optional[float]]] = None,
+    ):
+        self._max_concurrency = max_concurrency
+        self._limits = {**DEFAULT_LANE_LIMITS, **(lane_limits or {})}
+        self._max_wait = {**DEFAULT_LANE_MAX_WAIT, **(lane_max_wait or {})}
+        self._queues: Dict[str, Deque[asyncio.Future]] = {lane: deque() for lane in LANES}
+        self._active: Dict[str, int] = {lane: 0 for lane in LANES}
+        self._stats: Dict[str, _LaneStats] = {lane: _LaneStats() for lane in LANES}
+
+    @asynccontextmanager
+    async def slot(self, lane: str, max_wait: Optional[float] = None) -> AsyncIterator[None]:
+        """Hold a request slot in lane for the duration of the block.
+
+        Raises RequestDropped if the slot isn't granted within max_wait
+        seconds (the lane default when not given).
+        """
+        if lane not in self._queues:
+            raise ValueError(f"Unknown lane: {lane}")
+        if max_wait is None:
+            max_wait = self._max_wait[lane]
+
+        loop = asyncio.get_running_loop()
+        stats = self._stats[lane]
+        stats.requests += 1
+        enqueued = loop.time()
+
+        waiter: asyncio.Future = loop.create_future()
+        queue = self._queues[lane]
+        queue.append(waiter)
+        stats.max_depth = max(stats.max_depth, len(queue))
+        self._dispatch()
+
+        try:
+            await asyncio.wait_for(waiter, max_wait)
+        except asyncio.TimeoutError:
+            # wait_for can time out in the same tick _dispatch granted the
+            # slot; the slot is already counted as active, so use it
+            if not waiter.done() or waiter.cancelled():
+                stats.dropped += 1
+                _LOGGER.debug("Dropped %s request after waiting %.1fs", lane, loop.time() - enqueued)
+                raise RequestDropped(f"{lane} request waited longer than {max_wait}s") from None
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted in the same tick we were cancelled; hand the slot back
+                self._release(lane)
+            raise
+        finally:
+            if not waiter.done() or waiter.cancelled():
+                try:
+                    queue.remove(waiter)
+                except ValueError:
+                    pass
+
+        waited = loop.time() - enqueued
+        stats.granted += 1
+        stats.wait_total += waited
+        stats.wait_max = max(stats.wait_max, waited)
+        if waited > 1:
+            _LOGGER.debug("%s request waited %.1fs for a slot", lane, waited)
+
+        try:
+            yield
+        finally:
+            self._release(lane)
+
+    def _release(self, lane: str) -> None:
+        self._active[lane] -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Hand free slots to waiters, highest priority lane first."""
+        while sum(self._active.values()) < self._max_concurrency:
+            for lane in LANES:
+                queue = self._queues[lane]
+                while queue and queue[0].done():
+                    # Cancelled or timed out while queued
+                    queue.popleft()
+                if queue and self._active[lane] < self._limits[lane]:
+                    self._active[lane] += 1
+                    queue.popleft().set_result(None)
+                    break
+            else:
+                return
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Queue depth, concurrency and wait-time figures per lane."""
+        out: Dict[str, Dict[str, Any]] = {}
+        for lane in LANES:
+            stats = self._stats[lane]
+            out[lane] = {
+                "queued": sum(1 for w in self._queues[lane] if not w.done()),
+                "active": self._active[lane],
+                "limit": self._limits[lane],
+                "requests": stats.requests,
+                "granted": stats.granted,
+                "dropped": stats.dropped,
+                "max_queue_depth": stats.max_depth,
+                "avg_wait": round(stats.wait_total / stats.granted, 3) if stats.granted else 0.0,
+                "max_wait": round(stats.wait_max, 3),
+            }
+        return out
@@ -0,0 +1,97 @@
+"""Tests for TovalaClient's streaming history parser."""
+from __future__ import annotations
+import asyncio
+import json
+
+import pytest
+
+from custom_components.tovala.api import TovalaApiError, TovalaClient
+
+
+class _Content:
+    def __init__(self, body: bytes, chunk: int):
+        self._body = body
+        self._chunk = chunk
+
+    async def iter_chunked(self, _size):
+        for i in range(0, len(self._body), self._chunk):
+            yield self._body[i:i + self._chunk]
+
+
+class _Response:
+    def __init__(self, body: bytes, chunk: int, status: int):
+        self.content = _Content(body, chunk)
+        self.status = status
+        self._body = body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def text(self):
+        return self._body.decode()
+
+
+class _Session:
+    """Serves one body, failing with reject_status whenever params are sent."""
+
+    def __init__(self, body: bytes, chunk: int = 1, reject_status: int | None = None):
+        self._body = body
+        self._chunk = chunk
+        self._reject_status = reject_status
+        self.params = []
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        self.params.append(params)
+        status = self._reject_status if params and self._reject_status else 200
+        return _Response(self._body, self._chunk, status)
+
+
+def _client(session: _Session) -> TovalaClient:
+    client = TovalaClient(session, token="token")
+    client._user_id = 1
+    return client
+
+
+def _collect(body: bytes, chunk: int = 1):
+    async def run():
+        client = _client(_Session(body, chunk))
+        return [item async for item in client._iter_json_array("/history")]
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("chunk", [1, 2, 3, 64])
+def test_scalars_split_across_chunks(chunk):
+    body = b'[123, "str", 4.5e3, null, false]'
+    assert _collect(body, chunk) == [123, "str", 4500.0, None, False]
+
+
+@pytest.mark.parametrize(
+    "body",
+    [b'[{"a": 1}, {"b": ', b'[{"a": 1} {x}]', b"[1, 2", b'{"a": 1}'],
+)
+def test_truncated_or_malformed_body_raises(body):
+    with pytest.raises(TovalaApiError):
+        _collect(body)
+
+
+def test_oversized_element_raises():
+    body = b'[{"a": "' + b"x" * (512 * 1024)
+    with pytest.raises(TovalaApiError):
+        _collect(body, chunk=4096)
+
+
+@pytest.mark.parametrize("status", [400, 422])
+def test_history_retries_without_rejected_limit(status):
+    entries = [{"id": i} for i in range(5)]
+    session = _Session(json.dumps(entries).encode(), chunk=7, reject_status=status)
+    client = _client(session)
+
+    history = asyncio.run(client.cooking_history("oven", limit=2))
+
+    assert history == entries[:2]
+    assert session.params == [{"limit": 2}, None]
+    assert client._history_limit_supported is False
@@ -0,0 +1,169 @@
+"""Tests for the streaming cooking history export."""
+from __future__ import annotations
+import asyncio
+import csv
+import json
+
+import pytest
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.tovala import export
+from custom_components.tovala.api import TovalaApiError
+
+
+class _Store:
+    data: dict = {}
+
+    def __init__(self, hass, version, key):
+        self._key = key
+
+    async def async_load(self):
+        return self.data.get(self._key)
+
+    async def async_save(self, data):
+        self.data[self._key] = json.loads(json.dumps(data))
+
+
+class _Config:
+    def __init__(self, root):
+        self._root = root
+
+    def path(self, *parts):
+        return str(self._root.joinpath(*parts))
+
+
+class _Bus:
+    def __init__(self):
+        self.events = []
+
+    def async_fire(self, event_type, data):
+        self.events.append((event_type, data))
+
+
+class _Hass:
+    def __init__(self, root):
+        self.config = _Config(root)
+        self.bus = _Bus()
+
+    async def async_add_executor_job(self, func, *args):
+        return func(*args)
+
+
+class _Client:
+    """Serves history entries newest first, optionally failing partway."""
+
+    def __init__(self, ids, fail_after=None, meals=None):
+        self._ids = ids
+        self._fail_after = fail_after
+        self._meals = meals or {}
+        self.meal_calls = []
+
+    async def iter_cooking_history(self, oven_id):
+        for count, i in enumerate(self._ids):
+            if self._fail_after is not None and count == self._fail_after:
+                raise TovalaApiError("connection reset")
+            yield {
+                "id": i,
+                "start_time": f"2025-01-01T00:{i:02d}:00Z",
+                "meal_id": 7 if i % 2 else None,
+            }
+
+    async def fetch_meal_details(self, meal_id):
+        self.meal_calls.append(meal_id)
+        result = self._meals.get(meal_id)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+@pytest.fixture
+def hass(tmp_path, monkeypatch):
+    monkeypatch.setattr(export, "Store", _Store)
+    monkeypatch.setattr(_Store, "data", {})
+    return _Hass(tmp_path)
+
+
+def _export(hass, client, oven_id="oven", **kwargs):
+    return asyncio.run(export.async_export_history(hass, client, oven_id, **kwargs))
+
+
+def _marker(filename):
+    return _Store.data[export.STORAGE_KEY][filename]
+
+
+def _csv_ids(path):
+    with open(path, newline="", encoding="utf-8") as fh:
+        return [row["id"] for row in csv.DictReader(fh)]
+
+
+def test_fresh_export_writes_every_entry(hass, tmp_path):
+    client = _Client([3, 2, 1], meals={"7": {"title": "Salmon"}})
+
+    result = _export(hass, client)
+
+    path = tmp_path / "tovala_history_oven.jsonl"
+    rows = [json.loads(line) for line in path.read_text().splitlines()]
+    assert result == {"path": str(path), "exported": 3}
+    assert [row["id"] for row in rows] == [3, 2, 1]
+    assert [row["meal_title"] for row in rows] == ["Salmon", None, "Salmon"]
+    assert client.meal_calls == ["7"]
+    assert _marker(path.name)["last_key"] == "3"
+    assert hass.bus.events[-1][1]["done"] is True
+
+
+def test_resume_appends_only_newer_entries(hass, tmp_path):
+    _export(hass, _Client([3, 2, 1]), fmt="csv")
+    # Entry 3 has since vanished server-side; resume falls back to start_time
+    result = _export(hass, _Client([5, 4, 2, 1]), fmt="csv")
+
+    assert result["exported"] == 2
+    assert _csv_ids(tmp_path / "tovala_history_oven.csv") == ["3", "2", "1", "5", "4"]
+    assert _marker("tovala_history_oven.csv")["last_key"] == "5"
+
+
+def test_other_oven_rewrites_file(hass, tmp_path):
+    _export(hass, _Client([3, 2, 1]), fmt="csv", filename="shared.csv")
+    _export(hass, _Client([9, 8]), oven_id="other", fmt="csv", filename="shared.csv")
+
+    assert _csv_ids(tmp_path / "shared.csv") == ["9", "8"]
+    assert _marker("shared.csv")["oven_id"] == "other"
+
+
+def test_failed_run_leaves_file_and_marker(hass, tmp_path):
+    _export(hass, _Client([3, 2, 1]), fmt="csv")
+    marker = _marker("tovala_history_oven.csv")
+
+    with pytest.raises(TovalaApiError):
+        _export(hass, _Client([6, 5, 4, 3], fail_after=2), fmt="csv")
+
+    assert _csv_ids(tmp_path / "tovala_history_oven.csv") == ["3", "2", "1"]
+    assert _marker("tovala_history_oven.csv") == marker
+    assert not (tmp_path / "tovala_history_oven.csv.part").exists()
+
+
+@pytest.mark.parametrize(
+    ("filename", "fmt"),
+    [("configuration.yaml", "jsonl"), ("history.csv", "jsonl"), ("secrets.yaml", "csv")],
+)
+def test_rejects_filename_with_wrong_extension(hass, filename, fmt):
+    with pytest.raises(HomeAssistantError):
+        _export(hass, _Client([1]), fmt=fmt, filename=filename)
+
+
+@pytest.mark.parametrize("resume", [True, False])
+def test_refuses_to_overwrite_foreign_file(hass, tmp_path, resume):
+    path = tmp_path / "notes.jsonl"
+    path.write_text("keep me")
+
+    with pytest.raises(HomeAssistantError):
+        _export(hass, _Client([1]), filename="notes.jsonl", resume=resume)
+
+    assert path.read_text() == "keep me"
+
+
+def test_transient_meal_failure_is_retried(hass, tmp_path):
+    client = _Client([3, 1], meals={"7": TovalaApiError("dropped")})
+
+    _export(hass, client)
+
+    assert client.meal_calls == ["7", "7"]
@@ -0,0 +1,118 @@
+"""Tests for the per-account request scheduler."""
+from __future__ import annotations
+import asyncio
+
+import pytest
+
+from custom_components.tovala import scheduler
+from custom_components.tovala.scheduler import (
+    LANE_EXPORT,
+    LANE_HISTORY,
+    LANE_MEALS,
+    LANE_STATUS,
+    RequestDropped,
+    RequestScheduler,
+)
+
+
+def test_status_not_blocked_by_background_lanes():
+    async def run():
+        sched = RequestScheduler()
+        release = asyncio.Event()
+
+        async def hold(lane):
+            async with sched.slot(lane):
+                await release.wait()
+
+        background = (LANE_MEALS, LANE_HISTORY, LANE_EXPORT) * 3
+        holders = [asyncio.create_task(hold(lane)) for lane in background]
+        await asyncio.sleep(0)
+
+        async with sched.slot(LANE_STATUS, max_wait=0.1):
+            pass
+
+        release.set()
+        await asyncio.gather(*holders)
+        return sched.metrics()
+
+    metrics = asyncio.run(run())
+    assert metrics[LANE_STATUS]["granted"] == 1
+    assert all(lane["active"] == 0 for lane in metrics.values())
+
+
+def test_history_fetch_not_blocked_by_export():
+    async def run():
+        sched = RequestScheduler()
+        release = asyncio.Event()
+
+        async def hold():
+            async with sched.slot(LANE_EXPORT):
+                await release.wait()
+
+        exports = [asyncio.create_task(hold()) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        async with sched.slot(LANE_HISTORY, max_wait=0.1):
+            pass
+
+        release.set()
+        await asyncio.gather(*exports)
+        return sched.metrics()
+
+    metrics = asyncio.run(run())
+    assert metrics[LANE_HISTORY]["granted"] == 1
+    # The second export queued behind the first instead of taking a history slot
+    assert metrics[LANE_EXPORT]["max_queue_depth"] == 1
+    assert metrics[LANE_EXPORT]["granted"] == 2
+
+
+def test_stale_background_request_dropped():
+    async def run():
+        sched = RequestScheduler(lane_limits={LANE_MEALS: 1})
+        release = asyncio.Event()
+
+        async def hold():
+            async with sched.slot(LANE_MEALS):
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        with pytest.raises(RequestDropped):
+            async with sched.slot(LANE_MEALS, max_wait=0.01):
+                pass
+
+        release.set()
+        await holder
+        return sched.metrics()
+
+    metrics = asyncio.run(run())
+    assert metrics[LANE_MEALS]["dropped"] == 1
+    assert metrics[LANE_MEALS]["active"] == 0
+    assert metrics[LANE_MEALS]["queued"] == 0
+
+
+def test_grant_racing_deadline_does_not_leak_slot(monkeypatch):
+    """A slot granted in the tick wait_for times out must still be released."""
+
+    async def run():
+        sched = RequestScheduler(lane_limits={LANE_MEALS: 1})
+        holder = sched.slot(LANE_MEALS)
+        await holder.__aenter__()
+
+        async def wait_for(fut, timeout):
+            # Python 3.12+ behaviour: the holder releases (granting fut) in
+            # the same tick the timeout fires, and TimeoutError still wins
+            await holder.__aexit__(None, None, None)
+            assert fut.done() and not fut.cancelled()
+            raise asyncio.TimeoutError
+
+        monkeypatch.setattr(scheduler.asyncio, "wait_for", wait_for)
+        async with sched.slot(LANE_MEALS, max_wait=0.01):
+            in_slot = sched.metrics()[LANE_MEALS]["active"]
+        monkeypatch.undo()
+        return in_slot, sched.metrics()
+
+    in_slot, metrics = asyncio.run(run())
+    assert in_slot == 1
+    assert metrics[LANE_MEALS]["active"] == 0
+    assert metrics[LANE_MEALS]["dropped"] == 0